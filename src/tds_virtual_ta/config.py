@@ -1,5 +1,6 @@
 #### File 4: Update `src/tds_virtual_ta/config.py`
 
+import functools
 from typing import Optional
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -23,6 +24,8 @@ class Settings(BaseSettings):
     # Task Configuration
     task_timeout: int = Field(default=570)
     callback_timeout: int = Field(default=30)
+    worker_concurrency: int = Field(default=4)
+    task_queue_size: int = Field(default=256)
     
     # LLM Configuration
     aipipe_api_key: str = Field(...)
@@ -58,4 +61,12 @@ class Settings(BaseSettings):
         return v_upper
 
 
-settings = Settings()
\ No newline at end of file
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Lazy settings singleton.
+
+    Validation and the .env read happen on first use instead of at
+    import time, so importing any submodule stays cheap.
+    """
+    return Settings()
\ No newline at end of file
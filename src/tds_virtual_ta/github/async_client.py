@@ -0,0 +1,140 @@
+"""
+src/tds_virtual_ta/github/async_client.py
+Async GitHub read path with ETag-based conditional requests
+"""
+
+import base64
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from ..config import get_settings
+from ..utils.logging_config import get_logger
+from .ratelimit import rate_limit_hooks
+
+logger = get_logger(__name__)
+
+API_BASE = "https://api.github.com"
+
+
+class GitHubAsyncClient:
+    """
+    Thin async client for hot GitHub read paths.
+
+    Repeat GETs send If-None-Match with the cached ETag; 304 responses
+    are served from the local cache and do not count against the API
+    rate limit, so re-reads are near-free.
+    """
+
+    def __init__(self, token: Optional[str] = None):
+        self.token = token or get_settings().github_token
+        self.client = httpx.AsyncClient(
+            base_url=API_BASE,
+            headers={
+                "Authorization": f"Bearer {self.token}",
+                "Accept": "application/vnd.github+json",
+            },
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=16),
+            event_hooks=rate_limit_hooks(),
+        )
+        # url -> (etag, payload)
+        self._etags: Dict[str, Tuple[str, Any]] = {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.client.aclose()
+
+    async def get_json(
+        self,
+        url: str,
+        etag: Optional[str] = None
+    ) -> Tuple[int, Optional[str], Any]:
+        """
+        GET a JSON endpoint with conditional-request support.
+
+        Returns:
+            (status_code, etag, payload) - on 304 the payload comes
+            from the local cache.
+        """
+        cached = self._etags.get(url)
+        headers = {}
+
+        if etag is None and cached:
+            etag = cached[0]
+        if etag:
+            headers["If-None-Match"] = etag
+
+        response = await self.client.get(url, headers=headers)
+
+        if response.status_code == 304 and cached:
+            logger.debug(f"ETag hit (304): {url}")
+            return 304, cached[0], cached[1]
+
+        payload = response.json() if response.content else None
+        new_etag = response.headers.get("ETag")
+
+        if response.status_code == 200 and new_etag:
+            self._etags[url] = (new_etag, payload)
+
+        return response.status_code, new_etag, payload
+
+    async def get_repo(self, owner: str, repo: str) -> Optional[Dict[str, Any]]:
+        """Get repository metadata, or None if it does not exist."""
+        status, _, payload = await self.get_json(f"/repos/{owner}/{repo}")
+        if status == 404:
+            return None
+        return payload
+
+    async def get_latest_commit_sha(
+        self,
+        owner: str,
+        repo: str,
+        branch: str = "main"
+    ) -> Optional[str]:
+        """Get the latest commit SHA with a single per_page=1 request."""
+        status, _, payload = await self.get_json(
+            f"/repos/{owner}/{repo}/commits?sha={branch}&per_page=1"
+        )
+        if status == 404 or not payload:
+            return None
+        return payload[0]["sha"]
+
+    async def get_file_content(
+        self,
+        owner: str,
+        repo: str,
+        path: str,
+        ref: str = "main"
+    ) -> str:
+        """Get decoded file content, or empty string if not found."""
+        status, _, payload = await self.get_json(
+            f"/repos/{owner}/{repo}/contents/{path}?ref={ref}"
+        )
+        if status == 404 or payload is None:
+            logger.warning(f"File not found: {path}")
+            return ""
+        return base64.b64decode(payload["content"]).decode("utf-8")
+
+
+# Process-wide client, mirroring llm/http.get_client: the ETag cache
+# only pays off if it outlives a single read, and keepalive saves the
+# TCP+TLS handshake on every read after the first.
+_shared_client: Optional[GitHubAsyncClient] = None
+
+
+def get_async_client() -> GitHubAsyncClient:
+    """Get the shared async GitHub client, creating it lazily."""
+    global _shared_client
+    if _shared_client is None or _shared_client.client.is_closed:
+        _shared_client = GitHubAsyncClient()
+    return _shared_client
+
+
+async def close_async_client() -> None:
+    """Close the shared client - called once on app shutdown."""
+    global _shared_client
+    if _shared_client is not None and not _shared_client.client.is_closed:
+        await _shared_client.client.aclose()
@@ -3,28 +3,64 @@
 Corrected to return proper GitHubRepoInfo - REMOVED DUPLICATE CODE
 """
 
-from github import Github, GithubException
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+# Commit payloads: a mapping or an already-built (path, content) sequence
+FileSet = Union[Dict[str, str], Iterable[Tuple[str, str]]]
+import asyncio
+import hashlib
 import logging
 
+import httpx
+from cachetools import TTLCache
+
 from ..utils.retry import retry_sync
-from ..config import settings
+from ..config import get_settings
 from ..models import GitHubRepoInfo
+from .async_client import get_async_client
+from .ratelimit import rate_limit_hooks
 from .workflows import get_all_workflows
 
 logger = logging.getLogger(__name__)
 
 
+def _github_exceptions():
+    """Lazy exception tuple so decorating methods never imports PyGithub."""
+    from github import GithubException
+    return (GithubException,)
+
+
+def _git_blob_sha(data: bytes) -> str:
+    """Compute the git blob SHA of raw content bytes locally (no API call)."""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
 class GitHubManager:
     """GitHub repository manager."""
 
     def __init__(self):
-        self.token = settings.github_token
+        # PyGithub pulls in jwt/cryptography; import it only when a
+        # manager is actually constructed, not at module import.
+        from github import Github
+
+        self.token = get_settings().github_token
         self.github = Github(self.token)
         self.user = self.github.get_user()
         self.username = self.user.login
+        # Short-TTL caches: a single task hits the same repo several
+        # times (create -> commit -> read back), each a full round-trip.
+        self._repo_cache = TTLCache(maxsize=256, ttl=60)
+        self._content_cache = TTLCache(maxsize=256, ttl=60)
+
+    def _get_repo(self, repo_name: str):
+        """Get a repository object, caching lookups for a short TTL."""
+        repo = self._repo_cache.get(repo_name)
+        if repo is None:
+            repo = self.user.get_repo(repo_name)
+            self._repo_cache[repo_name] = repo
+        return repo
 
-    @retry_sync(max_attempts=3, exceptions=(GithubException,))
+    @retry_sync(max_attempts=3, exceptions=_github_exceptions)
     def create_or_get_repository(
         self,
         repo_name: str,
@@ -32,15 +68,19 @@ class GitHubManager:
         private: bool = False
     ) -> GitHubRepoInfo:
         """Create or get existing repository - RETURNS GitHubRepoInfo."""
+        from github import GithubException
         
         try:
             # Check if repo exists
-            repo = self.user.get_repo(repo_name)
+            repo = self._get_repo(repo_name)
             logger.info(f"Repository {repo_name} already exists")
-            
-            # Get latest commit
-            commits = list(repo.get_commits())
-            commit_sha = commits[0].sha if commits else "initial"
+
+            # Latest commit via the branch head - one API call instead
+            # of paging through the full commit history
+            try:
+                commit_sha = repo.get_branch(repo.default_branch).commit.sha
+            except GithubException:
+                commit_sha = "initial"  # empty repo
             
             return GitHubRepoInfo(
                 repo_name=repo_name,
@@ -63,13 +103,19 @@ class GitHubManager:
                 )
                 logger.info(f"Created new repository: {repo_name}")
                 
-                # Get initial commit
-                commits = list(repo.get_commits())
-                commit_sha = commits[0].sha if commits else "initial"
+                # Get initial commit from the branch head
+                try:
+                    commit_sha = repo.get_branch(repo.default_branch).commit.sha
+                except GithubException:
+                    commit_sha = "initial"  # empty repo
                 
-                # Add workflows
+                # Add both workflows in one batched commit
                 try:
-                    self._add_workflows(repo_name)
+                    commit_sha = self.commit_files(
+                        repo_name=repo_name,
+                        files=get_all_workflows(),
+                        commit_message="Add GitHub Actions workflows"
+                    )
                 except Exception as workflow_error:
                     logger.warning(f"Failed to add workflows: {workflow_error}")
                 
@@ -85,73 +131,162 @@ class GitHubManager:
             else:
                 raise
     
-    @retry_sync(max_attempts=3, exceptions=(GithubException,))
+    @retry_sync(max_attempts=3, exceptions=_github_exceptions)
     def commit_files(
         self,
         repo_name: str,
-        files: Dict[str, str],
+        files: FileSet,
         commit_message: str,
         branch: str = "main",
     ) -> str:
-        """Commit files and return the LAST commit SHA."""
-        repo = self.user.get_repo(repo_name)
-        last_commit_sha = ""
-        
-        logger.info(f"Committing {len(files)} files to {repo_name}")
-        
-        for path, content in files.items():
-            try:
-                # Try to get existing file
-                existing_file = repo.get_contents(path, ref=branch)
-                existing_content = existing_file.decoded_content.decode("utf-8")
-                
-                if existing_content == content:
-                    logger.debug(f"No change for {path}, skipping")
-                    continue
-                
-                # Update existing file
-                result = repo.update_file(
-                    path=path,
-                    message=commit_message,
-                    content=content,
-                    sha=existing_file.sha,
-                    branch=branch
-                )
-                last_commit_sha = result["commit"].sha
-                logger.debug(f"Updated: {path}")
-                
-            except GithubException as e:
-                if e.status == 404:
-                    # Create new file
-                    result = repo.create_file(
-                        path=path,
-                        message=commit_message,
-                        content=content,
-                        branch=branch
-                    )
-                    last_commit_sha = result["commit"].sha
-                    logger.debug(f"Created: {path}")
-                else:
-                    raise
-        
-        logger.info(f"Commit SHA: {last_commit_sha[:7]}")
-        return last_commit_sha
+        """Commit all files as a single atomic commit via the Git Data API."""
+        from github import InputGitTreeElement
 
-    def _add_workflows(self, repo_name: str) -> None:
-        """Add GitHub Actions workflows to repository."""
-        workflows = get_all_workflows()
-        
-        for path, content in workflows.items():
-            try:
-                self.commit_files(
-                    repo_name=repo_name,
-                    files={path: content},
-                    commit_message="Add GitHub Actions workflows"
+        repo = self._get_repo(repo_name)
+
+        items = list(files.items()) if hasattr(files, "items") else list(files)
+        logger.info(f"Committing {len(items)} files to {repo_name}")
+
+        ref = repo.get_git_ref(f"heads/{branch}")
+        base_commit = repo.get_git_commit(ref.object.sha)
+
+        # One recursive tree listing lets us skip unchanged files by
+        # comparing blob SHAs locally instead of fetching each file.
+        base_tree = repo.get_git_tree(base_commit.tree.sha, recursive=True)
+        existing_shas = {
+            element.path: element.sha
+            for element in base_tree.tree
+            if element.type == "blob"
+        }
+
+        elements = []
+        for path, content in items:
+            # Encode once per file; SHA compare avoids fetching/decoding
+            # the existing blob just for an equality check
+            if existing_shas.get(path) == _git_blob_sha(content.encode("utf-8")):
+                logger.debug(f"No change for {path}, skipping")
+                continue
+
+            blob = repo.create_git_blob(content, "utf-8")
+            elements.append(
+                InputGitTreeElement(path=path, mode="100644", type="blob", sha=blob.sha)
+            )
+            logger.debug(f"Staged: {path}")
+
+        if not elements:
+            logger.info("No file changes, keeping current commit")
+            return base_commit.sha
+
+        tree = repo.create_git_tree(elements, base_tree=base_commit.tree)
+        commit = repo.create_git_commit(commit_message, tree, [base_commit])
+        ref.edit(commit.sha)
+
+        logger.info(f"Commit SHA: {commit.sha[:7]}")
+        return commit.sha
+
+    async def commit_files_async(
+        self,
+        repo_name: str,
+        files: FileSet,
+        commit_message: str,
+        branch: str = "main",
+    ) -> str:
+        """
+        Async variant of commit_files: blobs are uploaded concurrently
+        with asyncio.gather, then the tree/commit/ref update (which must
+        be sequential) finish the commit. Wall time for N files drops
+        from N round-trips to roughly one.
+        """
+        base_url = f"https://api.github.com/repos/{self.username}/{repo_name}"
+        headers = {
+            "Authorization": f"Bearer {self.token}",
+            "Accept": "application/vnd.github+json",
+        }
+
+        items = list(files.items()) if hasattr(files, "items") else list(files)
+        logger.info(f"Committing {len(items)} files to {repo_name} (async)")
+
+        async with httpx.AsyncClient(
+            headers=headers,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=16),
+            event_hooks=rate_limit_hooks(),
+        ) as client:
+            ref_resp = await client.get(f"{base_url}/git/ref/heads/{branch}")
+            ref_resp.raise_for_status()
+            base_sha = ref_resp.json()["object"]["sha"]
+
+            commit_resp = await client.get(f"{base_url}/git/commits/{base_sha}")
+            commit_resp.raise_for_status()
+            base_tree_sha = commit_resp.json()["tree"]["sha"]
+
+            tree_resp = await client.get(
+                f"{base_url}/git/trees/{base_tree_sha}",
+                params={"recursive": "1"},
+            )
+            tree_resp.raise_for_status()
+            existing_shas = {
+                element["path"]: element["sha"]
+                for element in tree_resp.json().get("tree", [])
+                if element["type"] == "blob"
+            }
+
+            changed = [
+                (path, content)
+                for path, content in items
+                if existing_shas.get(path) != _git_blob_sha(content.encode("utf-8"))
+            ]
+
+            if not changed:
+                logger.info("No file changes, keeping current commit")
+                return base_sha
+
+            # Fan out blob creation - these are independent POSTs
+            blob_responses = await asyncio.gather(*[
+                client.post(
+                    f"{base_url}/git/blobs",
+                    json={"content": content, "encoding": "utf-8"}
                 )
-                logger.info(f"Added workflow: {path}")
-            except Exception as e:
-                logger.warning(f"Failed to add workflow {path}: {e}")
-      
+                for _, content in changed
+            ])
+
+            elements = []
+            for (path, _), blob_resp in zip(changed, blob_responses):
+                blob_resp.raise_for_status()
+                elements.append({
+                    "path": path,
+                    "mode": "100644",
+                    "type": "blob",
+                    "sha": blob_resp.json()["sha"],
+                })
+                logger.debug(f"Staged: {path}")
+
+            tree_resp = await client.post(
+                f"{base_url}/git/trees",
+                json={"base_tree": base_tree_sha, "tree": elements}
+            )
+            tree_resp.raise_for_status()
+
+            commit_resp = await client.post(
+                f"{base_url}/git/commits",
+                json={
+                    "message": commit_message,
+                    "tree": tree_resp.json()["sha"],
+                    "parents": [base_sha],
+                }
+            )
+            commit_resp.raise_for_status()
+            commit_sha = commit_resp.json()["sha"]
+
+            patch_resp = await client.patch(
+                f"{base_url}/git/refs/heads/{branch}",
+                json={"sha": commit_sha}
+            )
+            patch_resp.raise_for_status()
+
+        logger.info(f"Commit SHA: {commit_sha[:7]}")
+        return commit_sha
+
     def get_file_content(
         self,
         repo_name: str,
@@ -159,18 +294,52 @@ class GitHubManager:
         branch: str = "main"
     ) -> str:
         """Get content of a file from repository."""
-        repo = self.user.get_repo(repo_name)
+        from github import GithubException
+
+        cache_key = (repo_name, file_path, branch)
+        cached = self._content_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        repo = self._get_repo(repo_name)
 
         try:
             content = repo.get_contents(file_path, ref=branch)
-            return content.decoded_content.decode('utf-8')
+            decoded = content.decoded_content.decode('utf-8')
+            self._content_cache[cache_key] = decoded
+            return decoded
         except GithubException as e:
             if e.status == 404:
                 logger.warning(f"File not found: {file_path}")
                 return ""
             raise
 
-    @retry_sync(max_attempts=2, exceptions=(GithubException,))
+    async def get_file_content_async(
+        self,
+        repo_name: str,
+        file_path: str,
+        branch: str = "main"
+    ) -> str:
+        """
+        Async get_file_content using ETag conditional requests.
+
+        Reads go through the shared long-lived client so the ETag cache
+        and keepalive connection survive between calls, and results land
+        in the same short-TTL content cache the sync path uses.
+        """
+        cache_key = (repo_name, file_path, branch)
+        cached = self._content_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        content = await get_async_client().get_file_content(
+            self.username, repo_name, file_path, branch
+        )
+        if content:
+            self._content_cache[cache_key] = content
+        return content
+
+    @retry_sync(max_attempts=2, exceptions=_github_exceptions)
     def enable_pages(
         self,
         repo_name: str,
@@ -0,0 +1,88 @@
+"""
+src/tds_virtual_ta/github/ratelimit.py
+Adaptive pacing for GitHub API calls from rate-limit headers
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class GitHubRateLimiter:
+    """
+    Process-wide pacing from X-RateLimit-* headers.
+
+    While plenty of budget remains, calls pass through untouched. Once
+    the remaining budget drops below PACING_THRESHOLD, requests are
+    spread evenly across the window until the reset, which smooths
+    bursts instead of letting retries thrash an exhausted limit.
+    Secondary rate limits (403 + Retry-After) are honored exactly.
+    """
+
+    PACING_THRESHOLD = 100
+
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset: float = 0.0
+        self._blocked_until: float = 0.0
+
+    def update(self, response) -> None:
+        """Record rate-limit state from a response's headers."""
+        headers = response.headers
+        try:
+            self.remaining = int(headers["X-RateLimit-Remaining"])
+            self.reset = float(headers["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            pass
+
+        if response.status_code == 403:
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                # Secondary rate limit - wait exactly as instructed
+                self._blocked_until = time.time() + float(retry_after)
+                logger.warning(f"Secondary rate limit, blocked for {retry_after}s")
+            elif self.remaining == 0:
+                # Primary budget exhausted - wait for the reset
+                self._blocked_until = self.reset
+                logger.warning("Rate limit exhausted, blocked until reset")
+
+    async def throttle(self, request=None) -> None:
+        """Sleep as needed before the next call goes out."""
+        now = time.time()
+        delay = self._blocked_until - now
+
+        if (
+            delay <= 0
+            and self.remaining is not None
+            and 0 < self.remaining < self.PACING_THRESHOLD
+        ):
+            # Spread the remaining budget evenly until the reset
+            delay = (self.reset - now) / self.remaining
+
+        if delay > 0:
+            logger.warning(f"Rate-limit pacing: sleeping {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+_limiter = GitHubRateLimiter()
+
+
+def get_rate_limiter() -> GitHubRateLimiter:
+    """Get the shared rate limiter instance."""
+    return _limiter
+
+
+def rate_limit_hooks() -> Dict[str, List]:
+    """httpx event hooks applying adaptive pacing to every request."""
+
+    async def _on_request(request) -> None:
+        await _limiter.throttle(request)
+
+    async def _on_response(response) -> None:
+        _limiter.update(response)
+
+    return {"request": [_on_request], "response": [_on_response]}
@@ -6,9 +6,9 @@ FIXED - Correct workflows for static HTML sites
 from typing import Dict
 
 
-def generate_pages_workflow() -> str:
-    """Generate GitHub Actions workflow for GitHub Pages deployment (static HTML)."""
-    return """name: Deploy Static Site to GitHub Pages
+# Workflow YAML is constant, so build the strings once at import
+# instead of re-running the literal construction per repo.
+_PAGES_YAML = """name: Deploy Static Site to GitHub Pages
 
 on:
   push:
@@ -50,9 +50,7 @@ jobs:
 """
 
 
-def generate_ci_workflow() -> str:
-    """Generate CI workflow for basic validation."""
-    return """name: CI Validation
+_CI_YAML = """name: CI Validation
 
 on:
   push:
@@ -128,9 +126,22 @@ jobs:
 """
 
 
+_ALL_WORKFLOWS = {
+    ".github/workflows/pages.yml": _PAGES_YAML,
+    ".github/workflows/ci.yml": _CI_YAML,
+}
+
+
+def generate_pages_workflow() -> str:
+    """Get the GitHub Pages deployment workflow (static HTML)."""
+    return _PAGES_YAML
+
+
+def generate_ci_workflow() -> str:
+    """Get the CI validation workflow."""
+    return _CI_YAML
+
+
 def get_all_workflows() -> Dict[str, str]:
     """Get all workflow files for static site deployment."""
-    return {
-        ".github/workflows/pages.yml": generate_pages_workflow(),
-        ".github/workflows/ci.yml": generate_ci_workflow(),
-    }
+    return _ALL_WORKFLOWS
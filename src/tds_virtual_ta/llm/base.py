@@ -4,10 +4,64 @@ src/tds_virtual_ta/llm/base.py
 FIXED - Correct system prompt for static sites
 """
 
+import hashlib
+import json
 from abc import ABC, abstractmethod
 from typing import Optional
+
+from cachetools import TTLCache
+
 from ..models import LLMGenerationRequest, LLMGenerationResponse
 
+# Exact-match response cache shared by all adapters. Keys canonicalize
+# the request so trivial differences (whitespace, casing, check order)
+# still hit; entries expire after 10 minutes.
+_response_cache: TTLCache = TTLCache(maxsize=128, ttl=600)
+
+
+def _cache_key(request: LLMGenerationRequest) -> str:
+    canonical = json.dumps({
+        "brief": request.brief.strip().lower(),
+        "checks": sorted(c.strip() for c in request.checks),
+        "round": request.round,
+        # Attachments feed the prompt, so they are part of identity -
+        # digest the URLs (data URIs can be multi-MB) rather than
+        # embedding them in the key.
+        "attachments": sorted(
+            (att.name, hashlib.sha256(att.url.encode("utf-8")).hexdigest())
+            for att in request.attachments
+        ),
+        "code_sha": hashlib.sha256(
+            (request.existing_code or "").encode("utf-8")
+        ).hexdigest(),
+    }, sort_keys=True)
+    return hashlib.blake2b(canonical.encode("utf-8")).hexdigest()
+
+# Built once at import - the prompt is constant, so every call shares
+# the same string object instead of re-allocating ~600 bytes per attempt.
+_SYSTEM_PROMPT = """You are an expert front-end web developer specializing in creating production-ready static web applications using HTML, CSS, and JavaScript.
+
+Your expertise includes:
+- Writing clean, semantic HTML5
+- Modern CSS3 with responsive design
+- Vanilla JavaScript for interactivity
+- Using CDN libraries (Bootstrap, jQuery, marked, highlight.js, etc.)
+- Client-side data processing (CSV, JSON, images)
+- Accessibility and cross-browser compatibility
+- Professional UI/UX design principles
+
+CRITICAL RULES:
+1. Generate ONLY static files - NO server-side code
+2. Create self-contained HTML with embedded CSS and JavaScript
+3. Use CDN for all external libraries (Bootstrap 5, etc.)
+4. Ensure code works when opened directly in a browser
+5. Meet ALL specified evaluation criteria
+6. Include proper error handling
+7. Write clean, commented, production-ready code
+8. Make responsive, professional-looking interfaces
+
+OUTPUT: Only the requested files with === filename === markers. No explanations outside code."""
+
 
 class BaseLLMAdapter(ABC):
     """Abstract base class for LLM adapters."""
@@ -33,42 +87,50 @@ class BaseLLMAdapter(ABC):
         """
         pass
     
+    async def generate_application_cached(
+        self,
+        request: LLMGenerationRequest
+    ) -> LLMGenerationResponse:
+        """
+        generate_application behind the exact-match response cache.
+
+        Structurally identical requests (same brief/checks/round/
+        existing code modulo whitespace and ordering) return the cached
+        response without touching the provider. Fallback responses are
+        not cached so a recovered provider gets retried.
+        """
+        key = _cache_key(request)
+        cached = _response_cache.get(key)
+        if cached is not None:
+            return cached
+
+        response = await self.generate_application(request)
+        if response.model_used != "fallback":
+            _response_cache[key] = response
+        return response
+
     @abstractmethod
     async def check_health(self) -> bool:
         """Check if LLM service is available."""
         pass
     
     def _create_system_prompt(self) -> str:
-        """Create system prompt for static site generation."""
-        return """You are an expert front-end web developer specializing in creating production-ready static web applications using HTML, CSS, and JavaScript.
-
-Your expertise includes:
-- Writing clean, semantic HTML5
-- Modern CSS3 with responsive design
-- Vanilla JavaScript for interactivity
-- Using CDN libraries (Bootstrap, jQuery, marked, highlight.js, etc.)
-- Client-side data processing (CSV, JSON, images)
-- Accessibility and cross-browser compatibility
-- Professional UI/UX design principles
-
-CRITICAL RULES:
-1. Generate ONLY static files - NO server-side code
-2. Create self-contained HTML with embedded CSS and JavaScript
-3. Use CDN for all external libraries (Bootstrap 5, etc.)
-4. Ensure code works when opened directly in a browser
-5. Meet ALL specified evaluation criteria
-6. Include proper error handling
-7. Write clean, commented, production-ready code
-8. Make responsive, professional-looking interfaces
-
-OUTPUT: Only the requested files with === filename === markers. No explanations outside code."""
+        """Return the (module-cached) system prompt for static site generation."""
+        return _SYSTEM_PROMPT
 
 
 class LLMGenerationError(Exception):
     """Exception raised when LLM generation fails."""
-    
-    def __init__(self, message: str, provider: str, model: str):
+
+    def __init__(
+        self,
+        message: str,
+        provider: str,
+        model: str,
+        status_code: Optional[int] = None
+    ):
         self.message = message
         self.provider = provider
         self.model = model
+        self.status_code = status_code
         super().__init__(f"[{provider}/{model}] {message}")
@@ -0,0 +1,41 @@
+"""
+src/tds_virtual_ta/llm/http.py
+Process-wide HTTP client shared by all LLM adapters
+"""
+
+from typing import Optional
+
+import httpx
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Get the shared async HTTP client, creating it lazily.
+
+    HTTP/2 multiplexes the fallback-model attempts over one connection
+    and keepalive amortizes TLS handshakes across retries, instead of
+    each adapter instance paying a fresh TCP+TLS setup.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=100,
+                max_keepalive_connections=20,
+                keepalive_expiry=300,
+            ),
+            timeout=httpx.Timeout(120.0, connect=5.0, read=110.0),
+            follow_redirects=True,
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared client - called once on app shutdown."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
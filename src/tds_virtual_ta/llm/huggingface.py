@@ -1,272 +1,476 @@
-import httpx
-import time
-import re
-from typing import Dict
-
-from .base import BaseLLMAdapter, LLMGenerationError
-from .prompts import create_static_site_prompt, get_mit_license
-from ..models import LLMGenerationRequest, LLMGenerationResponse
-from ..utils.retry import retry_async
-from ..utils.logging_config import get_logger
-
-logger = get_logger(__name__)
-
-
-class HuggingFaceLLMAdapter(BaseLLMAdapter):
-    """HuggingFace Inference API adapter - FIXED"""
-    
-    def __init__(self, api_key: str, model: str, base_url: str):
-        super().__init__(api_key, model, base_url)
-        self.client = httpx.AsyncClient(timeout=120.0)
-        # Construct full URL
-        self.endpoint = f"{base_url}/{model}"
-    
-    async def __aenter__(self):
-        return self
-    
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        await self.client.aclose()
-    
-    @retry_async(max_attempts=2, exceptions=(httpx.HTTPError,))
-    async def generate_application(
-        self,
-        request: LLMGenerationRequest
-    ) -> LLMGenerationResponse:
-        """Generate application using HuggingFace Inference API."""
-        start_time = time.time()
-        
-        try:
-            prompt = create_static_site_prompt(
-                brief=request.brief,
-                checks=request.checks,
-                attachments=request.attachments,
-                round=request.round,
-                existing_code=request.existing_code
-            )
-            
-            logger.info(f"Calling HuggingFace API with model {self.model}")
-            
-            # HuggingFace Inference API format
-            response = await self.client.post(
-                self.endpoint,
-                json={
-                    "inputs": prompt,
-                    "parameters": {
-                        "max_new_tokens": 4000,
-                        "temperature": 0.7,
-                        "top_p": 0.95,
-                        "do_sample": True,
-                        "return_full_text": False
-                    }
-                },
-                headers={
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json"
-                }
-            )
-            
-            response.raise_for_status()
-            data = response.json()
-            
-            # Parse HF response (can be list or dict)
-            content = ""
-            if isinstance(data, list) and len(data) > 0:
-                content = data[0].get("generated_text", "")
-            elif isinstance(data, dict):
-                content = data.get("generated_text", "") or data.get("text", "")
-            else:
-                content = str(data)
-            
-            if not content:
-                raise LLMGenerationError("Empty response from HuggingFace", "HuggingFace", self.model)
-            
-            # Parse files
-            files = self._parse_files_from_response(content)
-            
-            # Ensure required files
-            if "index.html" not in files:
-                logger.warning("No index.html found, generating fallback")
-                files["index.html"] = self._generate_fallback_html(request.brief, request.checks)
-            if "README.md" not in files:
-                files["README.md"] = self._generate_fallback_readme(request.brief)
-            if "LICENSE" not in files:
-                files["LICENSE"] = get_mit_license()
-            
-            generation_time = time.time() - start_time
-            
-            return LLMGenerationResponse(
-                index_html=files["index.html"],
-                readme_md=files["README.md"],
-                license_text=files["LICENSE"],
-                additional_files={},
-                model_used=self.model,
-                generation_time=generation_time
-            )
-        
-        except httpx.HTTPError as e:
-            logger.error(f"HuggingFace API error: {e}")
-            # If 503, model is loading
-            if "503" in str(e):
-                raise LLMGenerationError("Model is loading, try again in a minute", "HuggingFace", self.model)
-            raise LLMGenerationError(f"API request failed: {str(e)}", "HuggingFace", self.model)
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise LLMGenerationError(f"Unexpected error: {str(e)}", "HuggingFace", self.model)
-    
-    def _parse_files_from_response(self, content: str) -> Dict[str, str]:
-        """Parse files from response."""
-        files = {}
-        
-        # Try === filename === format
-        pattern = r'===\s*([^\s=]+)\s*===\s*\n(.*?)(?=\n===|$)'
-        matches = re.findall(pattern, content, re.DOTALL)
-        
-        for filename, file_content in matches:
-            files[filename.strip()] = file_content.strip()
-        
-        return files
-    
-    def _generate_fallback_html(self, brief: str, checks: list) -> str:
-        """Generate fallback HTML - same as AIPipe."""
-        element_ids = set()
-        elements_info = []
-        for check in checks:
-            ids = re.findall(r'#([\w-]+)', check)
-            element_ids.update(ids)
-            for elem_id in ids:
-                context = check.lower()
-                element_type = self._determine_element_type(elem_id, context)
-                elements_info.append((elem_id, element_type))
-        
-        elements_html = ""
-        for elem_id, element_type in sorted(elements_info):
-            elements_html += self._create_html_element(elem_id, element_type)
-    
-        return f'''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Dynamic Web Application</title>
-    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    <style>
-        body {{ 
-            padding: 2rem; 
-            background: #f8f9fa; 
-            min-height: 100vh; 
-        }}
-        .container {{ 
-            max-width: 800px; 
-        }}
-        .card {{ 
-            border: none; 
-            border-radius: 15px; 
-            box-shadow: 0 5px 15px rgba(0,0,0,0.1); 
-        }}
-        .form-control:focus, .form-select:focus {{ 
-            box-shadow: 0 0 0 0.2rem rgba(0,123,255,0.25); 
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="card p-4 bg-white">
-            <h1 class="h3 mb-4">Web Application</h1>
-            <p class="lead mb-4">{brief}</p>
-            <div class="dynamic-elements">
-{elements_html}
-            </div>
-        </div>
-    </div>
-    <script>
-        // Generic event handlers
-        document.addEventListener('DOMContentLoaded', function() {{
-            // Handle button clicks
-            document.querySelectorAll('button').forEach(btn => {{
-                btn.addEventListener('click', (e) => {{
-                    console.log('Button clicked:', e.target.id);
-                }});
-            }});
-
-            // Handle input changes
-            document.querySelectorAll('input, select, textarea').forEach(input => {{
-                input.addEventListener('change', (e) => {{
-                    console.log('Input changed:', e.target.id, e.target.value);
-                }});
-            }});
-        }});
-    </script>
-</body>
-</html>'''
-    
-    def _determine_element_type(self, elem_id: str, context: str) -> str:
-        """Determine the most appropriate HTML element type based on ID and context."""
-        elem_id = elem_id.lower()
-        
-        # Input types
-        if any(word in context for word in ['number', 'calculate', 'sum', 'total']):
-            return 'number'
-        if any(word in context for word in ['email', 'mail']):
-            return 'email'
-        if any(word in context for word in ['password', 'pwd']):
-            return 'password'
-        if any(word in context for word in ['date', 'calendar']):
-            return 'date'
-        if any(word in context for word in ['color', 'colour']):
-            return 'color'
-        
-        # Other element types
-        if any(word in elem_id for word in ['button', 'submit', 'send']):
-            return 'button'
-        if any(word in elem_id for word in ['select', 'dropdown', 'picker']):
-            return 'select'
-        if any(word in elem_id for word in ['text', 'area', 'message']):
-            return 'textarea'
-        if any(word in context for word in ['input']):
-            return 'text'
-        
-        # Default to div for output/display elements
-        return 'div'
-   
-    
-    def _create_html_element(self, elem_id: str, element_type: str) -> str:
-        """Create HTML element based on type."""
-        if element_type == 'button':
-            return f'            <button id="{elem_id}" class="btn btn-primary mb-3">{elem_id.replace("-", " ").title()}</button>\n'
-        elif element_type == 'select':
-            return f'            <select id="{elem_id}" class="form-select mb-3"><option value="">Select an option...</option></select>\n'
-        elif element_type == 'textarea':
-            return f'            <textarea id="{elem_id}" class="form-control mb-3" rows="3" placeholder="Enter text..."></textarea>\n'
-        elif element_type == 'div':
-            return f'            <div id="{elem_id}" class="alert alert-light mb-3">Output will appear here</div>\n'
-        else:
-            # Handle all input types
-            return f'            <input type="{element_type}" id="{elem_id}" class="form-control mb-3" placeholder="Enter {element_type}...">\n'
-
-
-    def _generate_fallback_readme(self, brief: str) -> str:
-        """Generate basic README."""
-        return f'''# Generated Application
-
-## Description
-{brief}
-
-## Usage
-Open `index.html` in a web browser.
-
-## License
-MIT License
-'''
-    
-    async def check_health(self) -> bool:
-        """Check HF API health."""
-        try:
-            response = await self.client.get(
-                self.endpoint,
-                headers={"Authorization": f"Bearer {self.api_key}"},
-                timeout=10.0
-            )
-            # 503 means model is loading (still healthy)
-            return response.status_code in [200, 503]
-        except Exception:
-            return False
\ No newline at end of file
+import asyncio
+import html
+import httpx
+import orjson
+import time
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .base import BaseLLMAdapter, LLMGenerationError
+from .http import get_client
+from .prompts import create_static_site_prompt, get_mit_license
+from ..models import LLMGenerationRequest, LLMGenerationResponse
+from ..utils.retry import retry_async
+from ..utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Compiled once - the parse path runs per response, often ~4000 tokens
+_FILE_RE = re.compile(r'===\s*([^\s=]+)\s*===\s*\n(.*?)(?=\n===|$)', re.DOTALL)
+
+# Element-type classification in one scan per string: the group name
+# that matches is the element type.
+_ID_TYPE_RE = re.compile(
+    r'(?P<button>button|submit|send)'
+    r'|(?P<select>select|dropdown|picker)'
+    r'|(?P<textarea>text|area|message)'
+)
+_CTX_TYPE_RE = re.compile(
+    r'(?P<number>number|calculate|sum|total)'
+    r'|(?P<email>email|mail)'
+    r'|(?P<password>password|pwd)'
+    r'|(?P<date>date|calendar)'
+    r'|(?P<color>color|colour)'
+    r'|(?P<text>input)'
+)
+
+_ID_PAT = re.compile(r'#([\w-]+)')
+
+# Generation budget. Without shipping a local tokenizer (the serverless
+# Inference API only accepts text inputs anyway), estimate prompt length
+# at ~4 chars/token and cap max_new_tokens so prompt + generation fits
+# the model context instead of always requesting a 4000-token overshoot.
+_CHARS_PER_TOKEN = 4
+_CONTEXT_LIMIT = 8192
+
+
+def _max_new_tokens(prompt: str) -> int:
+    estimated_prompt_tokens = len(prompt) // _CHARS_PER_TOKEN + 1
+    return max(256, min(4000, _CONTEXT_LIMIT - estimated_prompt_tokens))
+
+# Fallback page shell, split once at import into static chunks shared
+# by every request; only the brief and elements vary per call. Kept as
+# str because LLMGenerationResponse fields are str - going through
+# bytes would just add an encode/decode round trip.
+_FALLBACK_PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Dynamic Web Application</title>
+    <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
+    <style>
+        body {
+            padding: 2rem;
+            background: #f8f9fa;
+            min-height: 100vh;
+        }
+        .container {
+            max-width: 800px;
+        }
+        .card {
+            border: none;
+            border-radius: 15px;
+            box-shadow: 0 5px 15px rgba(0,0,0,0.1);
+        }
+        .form-control:focus, .form-select:focus {
+            box-shadow: 0 0 0 0.2rem rgba(0,123,255,0.25);
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="card p-4 bg-white">
+            <h1 class="h3 mb-4">Web Application</h1>
+            <p class="lead mb-4">$brief</p>
+            <div class="dynamic-elements">
+$elements_html
+            </div>
+        </div>
+    </div>
+    <script>
+        // Generic event handlers
+        document.addEventListener('DOMContentLoaded', function() {
+            // Handle button clicks
+            document.querySelectorAll('button').forEach(btn => {
+                btn.addEventListener('click', (e) => {
+                    console.log('Button clicked:', e.target.id);
+                });
+            });
+
+            // Handle input changes
+            document.querySelectorAll('input, select, textarea').forEach(input => {
+                input.addEventListener('change', (e) => {
+                    console.log('Input changed:', e.target.id, e.target.value);
+                });
+            });
+        });
+    </script>
+</body>
+</html>'''
+
+_FB_PREFIX, _rest = _FALLBACK_PAGE.split("$brief", 1)
+_FB_MID, _FB_SUFFIX = _rest.split("$elements_html", 1)
+del _rest
+
+
+class _DynamicBatcher:
+    """
+    Coalesce concurrent HF calls into one batched inference request.
+
+    Prompts arriving within a short window (or until the batch fills)
+    are submitted together as a list of inputs, amortizing network RTT
+    and model-warmup overhead across simultaneous tasks. A lone prompt
+    flushes after the window with no extra cost beyond the 50ms wait.
+    """
+
+    def __init__(self, batch_size: int = 8, window: float = 0.05):
+        self.batch_size = batch_size
+        self.window = window
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.Task] = None
+        # asyncio keeps only weak refs to tasks - hold flush tasks here
+        # so they cannot be garbage-collected mid-flight
+        self._inflight: set = set()
+
+    async def submit(self, adapter: "HuggingFaceLLMAdapter", prompt: str) -> str:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((prompt, future))
+        if len(self._pending) >= self.batch_size:
+            self._flush(adapter)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.create_task(self._delayed_flush(adapter))
+        return await future
+
+    async def _delayed_flush(self, adapter: "HuggingFaceLLMAdapter"):
+        await asyncio.sleep(self.window)
+        self._flush(adapter)
+
+    def _flush(self, adapter: "HuggingFaceLLMAdapter"):
+        batch, self._pending = self._pending, []
+        handle, self._flush_handle = self._flush_handle, None
+        if handle is not None and handle is not asyncio.current_task():
+            handle.cancel()
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run(adapter, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _run(self, adapter, batch):
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            texts = await adapter._post_batch(prompts)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), text in zip(batch, texts):
+            if not future.done():
+                future.set_result(text)
+
+
+# One batcher per endpoint so different models never share a batch.
+_batchers: Dict[str, _DynamicBatcher] = {}
+
+
+def _get_batcher(endpoint: str) -> _DynamicBatcher:
+    batcher = _batchers.get(endpoint)
+    if batcher is None:
+        batcher = _batchers[endpoint] = _DynamicBatcher()
+    return batcher
+
+
+class HuggingFaceLLMAdapter(BaseLLMAdapter):
+    """HuggingFace Inference API adapter - FIXED"""
+    
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str,
+        client: Optional[httpx.AsyncClient] = None
+    ):
+        super().__init__(api_key, model, base_url)
+        self.client = client or get_client()
+        self._health = (False, 0.0)  # (result, monotonic expiry)
+        # Construct full URL
+        self.endpoint = f"{base_url}/{model}"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        # The shared client stays open; it is closed on app shutdown
+        pass
+    
+    @retry_async(max_attempts=2, exceptions=(httpx.HTTPError,))
+    async def generate_application(
+        self,
+        request: LLMGenerationRequest
+    ) -> LLMGenerationResponse:
+        """Generate application using HuggingFace Inference API."""
+        start_time = time.perf_counter()
+        
+        try:
+            prompt = create_static_site_prompt(
+                brief=request.brief,
+                checks=request.checks,
+                attachments=request.attachments,
+                round=request.round,
+                existing_code=request.existing_code
+            )
+            
+            logger.info(f"Calling HuggingFace API with model {self.model}")
+
+            # Concurrent calls within the batching window share one request
+            content = await _get_batcher(self.endpoint).submit(self, prompt)
+
+            if not content:
+                raise LLMGenerationError("Empty response from HuggingFace", "HuggingFace", self.model)
+            
+            # Parse files
+            files = self._parse_files_from_response(content)
+            
+            # Ensure required files
+            if "index.html" not in files:
+                logger.warning("No index.html found, generating fallback")
+                # Regex scanning + string assembly are CPU-bound; keep
+                # them off the event loop so other tasks aren't stalled
+                files["index.html"] = await asyncio.to_thread(
+                    self._generate_fallback_html, request.brief, request.checks
+                )
+            if "README.md" not in files:
+                files["README.md"] = self._generate_fallback_readme(request.brief)
+            if "LICENSE" not in files:
+                files["LICENSE"] = get_mit_license()
+            
+            generation_time = time.perf_counter() - start_time
+            
+            return LLMGenerationResponse.model_construct(
+                index_html=files["index.html"],
+                readme_md=files["README.md"],
+                license_text=files["LICENSE"],
+                additional_files={},
+                model_used=self.model,
+                generation_time=generation_time
+            )
+        
+        except httpx.HTTPError as e:
+            logger.error(f"HuggingFace API error: {e}")
+            # If 503, model is loading
+            if "503" in str(e):
+                raise LLMGenerationError("Model is loading, try again in a minute", "HuggingFace", self.model)
+            raise LLMGenerationError(f"API request failed: {str(e)}", "HuggingFace", self.model)
+        except Exception as e:
+            logger.error(f"Unexpected error: {e}")
+            raise LLMGenerationError(f"Unexpected error: {str(e)}", "HuggingFace", self.model)
+    
+    async def _post_batch(self, prompts: List[str]) -> List[str]:
+        """Issue one HF inference call covering a whole batch of prompts."""
+        if len(prompts) == 1:
+            # Common case: stream the lone generation instead of
+            # buffering the full 4000-token body before parsing starts.
+            return [await self._stream_single(prompts[0])]
+
+        response = await self.client.post(
+            self.endpoint,
+            content=orjson.dumps({
+                "inputs": prompts if len(prompts) > 1 else prompts[0],
+                "parameters": {
+                    # Shared across the batch - bounded by the longest prompt
+                    "max_new_tokens": min(_max_new_tokens(p) for p in prompts),
+                    "temperature": 0.7,
+                    "top_p": 0.95,
+                    "do_sample": True,
+                    "return_full_text": False
+                }
+            }),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+        response.raise_for_status()
+        return self._extract_batch_texts(orjson.loads(response.content), len(prompts))
+
+    async def _stream_single(self, prompt: str) -> str:
+        """
+        Stream one generation over SSE, consuming tokens as they arrive.
+
+        Falls back to the buffered JSON body when the endpoint does not
+        speak event-stream (older Inference API deployments).
+        """
+        chunks: List[str] = []
+        async with self.client.stream(
+            "POST",
+            self.endpoint,
+            content=orjson.dumps({
+                "inputs": prompt,
+                "parameters": {
+                    "max_new_tokens": _max_new_tokens(prompt),
+                    "temperature": 0.7,
+                    "top_p": 0.95,
+                    "do_sample": True,
+                    "return_full_text": False
+                },
+                "stream": True
+            }),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        ) as response:
+            response.raise_for_status()
+
+            if "text/event-stream" not in response.headers.get("content-type", ""):
+                body = await response.aread()
+                return self._extract_batch_texts(orjson.loads(body), 1)[0]
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = orjson.loads(data)
+                except ValueError:
+                    continue
+                # TGI's final event carries the complete text
+                if event.get("generated_text"):
+                    return event["generated_text"]
+                token = event.get("token")
+                if token:
+                    chunks.append(token.get("text", ""))
+
+        return "".join(chunks)
+
+    @staticmethod
+    def _extract_batch_texts(data, n: int) -> List[str]:
+        """
+        Normalize HF response shapes to one text per prompt.
+
+        Single prompt: list[dict] or dict. Batched: one entry per
+        prompt, each itself a list[dict] or dict.
+        """
+        items = [data] if n == 1 else (data if data.__class__ is list else [data] * n)
+        texts = []
+        for item in items:
+            # Fast path: the universal HF shape is [{"generated_text": ...}]
+            try:
+                texts.append(item[0]["generated_text"])
+                continue
+            except (KeyError, IndexError, TypeError):
+                pass
+            if isinstance(item, dict):
+                texts.append(item.get("generated_text") or item.get("text") or "")
+            elif isinstance(item, list):
+                # Malformed list entries (e.g. [{}]) carry no text - keep
+                # them empty so the empty-response error path still fires
+                texts.append("")
+            else:
+                texts.append(str(item) if item else "")
+        return texts
+
+    def _parse_files_from_response(self, content: str) -> Dict[str, str]:
+        """Parse === filename === blocks from response."""
+        files = {}
+        for match in _FILE_RE.finditer(content):
+            files[match.group(1).strip()] = match.group(2).strip()
+        return files
+    
+    def _generate_fallback_html(self, brief: str, checks: list) -> str:
+        """Generate fallback HTML from the precomputed template."""
+        # Single sweep: unique (id, type) pairs across all checks
+        pairs = set()
+        for check in checks:
+            context = check.lower()
+            for elem_id in _ID_PAT.findall(check):
+                pairs.add((elem_id, self._determine_element_type(elem_id, context)))
+
+        elements_html = "".join(
+            self._create_html_element(elem_id, element_type)
+            for elem_id, element_type in sorted(pairs)
+        )
+
+        return "".join(
+            (_FB_PREFIX, html.escape(brief), _FB_MID, elements_html, _FB_SUFFIX)
+        )
+    
+    def _determine_element_type(self, elem_id: str, context: str) -> str:
+        """
+        Determine the most appropriate HTML element type based on ID and
+        context. One regex scan per string replaces the old chain of
+        eight substring sweeps; context must already be lowercased.
+        """
+        match = _ID_TYPE_RE.search(elem_id.lower())
+        if match:
+            return match.lastgroup
+
+        match = _CTX_TYPE_RE.search(context)
+        if match:
+            return match.lastgroup
+
+        # Default to div for output/display elements
+        return 'div'
+
+
+    def _create_html_element(self, elem_id: str, element_type: str) -> str:
+        """Create HTML element based on type."""
+        if element_type == 'button':
+            return f'            <button id="{elem_id}" class="btn btn-primary mb-3">{elem_id.replace("-", " ").title()}</button>\n'
+        elif element_type == 'select':
+            return f'            <select id="{elem_id}" class="form-select mb-3"><option value="">Select an option...</option></select>\n'
+        elif element_type == 'textarea':
+            return f'            <textarea id="{elem_id}" class="form-control mb-3" rows="3" placeholder="Enter text..."></textarea>\n'
+        elif element_type == 'div':
+            return f'            <div id="{elem_id}" class="alert alert-light mb-3">Output will appear here</div>\n'
+        else:
+            # Handle all input types
+            return f'            <input type="{element_type}" id="{elem_id}" class="form-control mb-3" placeholder="Enter {element_type}...">\n'
+
+
+    def _generate_fallback_readme(self, brief: str) -> str:
+        """Generate basic README."""
+        return f'''# Generated Application
+
+## Description
+{brief}
+
+## Usage
+Open `index.html` in a web browser.
+
+## License
+MIT License
+'''
+    
+    async def check_health(self) -> bool:
+        """
+        Check HF API health with a cheap HEAD probe (cached for 30s).
+
+        A GET against the model endpoint can trigger inference-graph
+        warmup; HEAD avoids that, with a GET fallback only when the
+        endpoint rejects HEAD outright.
+        """
+        now = time.monotonic()
+        if now < self._health[1]:
+            return self._health[0]
+
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        try:
+            response = await self.client.head(
+                self.endpoint, headers=headers, timeout=5.0
+            )
+            if response.status_code == 405:
+                response = await self.client.get(
+                    self.endpoint, headers=headers, timeout=10.0
+                )
+            # 503 means model is loading (still healthy)
+            ok = response.status_code in (200, 503)
+        except Exception:
+            ok = False
+
+        self._health = (ok, now + 30.0)
+        return ok
\ No newline at end of file
@@ -1,43 +1,43 @@
 """
 src/tds_virtual_ta/llm/prompts.py
 FIXED - Correct prompts for STATIC site generation (HTML/CSS/JS only)
+
+Prompts are split into a fixed static prefix (built once at import) and
+a dynamic tail appended at the end. Keeping all boilerplate byte-stable
+at the front lets providers reuse their prompt cache across calls; only
+the tail (brief/checks/attachments/existing code) varies per task.
 """
 
-from typing import List
+import functools
+import sys
+from typing import Final, List, Optional, Tuple
 from ..models import Attachment
 
+# Single shared copy of the license text. Interning lets every prompt,
+# response and fallback path reference the same ~1KB string object.
+MIT_LICENSE_TEXT: Final[str] = sys.intern("""MIT License
 
-def create_static_site_prompt(
-    brief: str,
-    checks: List[str],
-    attachments: List[Attachment],
-    round: int = 1,
-    existing_code: str = None
-) -> str:
-    """Create prompt for static HTML/JS/CSS generation."""
-    
-    attachments_info = ""
-    if attachments:
-        attachments_info = "\n\nATTACHMENTS PROVIDED:\n"
-        for att in attachments:
-            mime_type = att.url.split(";")[0].replace("data:", "") if ":" in att.url else "unknown"
-            attachments_info += f"- {att.name} ({mime_type}) - embedded as data URI\n"
-        attachments_info += "\nIMPORTANT: Access attachments using their data URIs or embed them inline.\n"
-    
-    checks_info = ""
-    if checks:
-        checks_info = "\n\nEVALUATION CRITERIA (MUST MEET ALL):\n"
-        for i, check in enumerate(checks, 1):
-            checks_info += f"{i}. {check}\n"
-        checks_info += "\nCRITICAL: Every check must pass. Ensure all IDs, classes, and functionality exist.\n"
-    
-    if round == 1 or not existing_code:
-        return f'''You are an expert front-end developer specializing in creating modern, responsive static web applications.
+Copyright (c) 2025
+
+Permission is hereby granted, free of charge, to any person obtaining a copy
+of this software and associated documentation files (the "Software"), to deal
+in the Software without restriction, including without limitation the rights
+to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+copies of the Software, and to permit persons to whom the Software is
+furnished to do so, subject to the following conditions:
 
-TASK:
-{brief}
-{attachments_info}
-{checks_info}
+The above copyright notice and this permission notice shall be included in all
+copies or substantial portions of the Software.
+
+THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+SOFTWARE.""")
+
+_STATIC_PREFIX_R1 = '''You are an expert front-end developer specializing in creating modern, responsive static web applications.
 
 CRITICAL REQUIREMENTS:
 1. Create a SINGLE, SELF-CONTAINED HTML file (index.html) with embedded CSS and JavaScript
@@ -82,23 +82,23 @@ OUTPUT FORMAT (CRITICAL - Follow exactly):
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Application Title</title>
-    
+
     <!-- Bootstrap 5 -->
     <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css" rel="stylesheet">
-    
+
     <!-- Additional CDN libraries as needed -->
-    
+
     <style>
         /* Custom CSS here */
-        body {{
+        body {
             padding: 2rem;
             background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
             min-height: 100vh;
-        }}
-        .card {{
+        }
+        .card {
             border-radius: 15px;
             box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-        }}
+        }
         /* More custom styles */
     </style>
 </head>
@@ -106,12 +106,12 @@ OUTPUT FORMAT (CRITICAL - Follow exactly):
     <div class="container">
         <div class="card p-4 bg-white">
             <h1 class="mb-4">Application Title</h1>
-            
+
             <!-- Your HTML content with ALL required IDs -->
-            
+
         </div>
     </div>
-    
+
     <script>
         // Your JavaScript code here
         // Handle all functionality
@@ -185,8 +185,7 @@ Explain the main functions and data flow:
 - DOM manipulation
 
 ## Evaluation Criteria
-This application meets the following requirements:
-{chr(10).join(f"- {check}" for check in checks)}
+List every evaluation criterion from the checks below and how it is met.
 
 ## License
 This project is licensed under the MIT License - see the LICENSE file for details.
@@ -195,27 +194,7 @@ This project is licensed under the MIT License - see the LICENSE file for detail
 Generated as part of IIT Madras TDS Project
 
 === LICENSE ===
-MIT License
-
-Copyright (c) 2025
-
-Permission is hereby granted, free of charge, to any person obtaining a copy
-of this software and associated documentation files (the "Software"), to deal
-in the Software without restriction, including without limitation the rights
-to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
-copies of the Software, and to permit persons to whom the Software is
-furnished to do so, subject to the following conditions:
-
-The above copyright notice and this permission notice shall be included in all
-copies or substantial portions of the Software.
-
-THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
-IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
-FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
-AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
-LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
-OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
-SOFTWARE.
+''' + MIT_LICENSE_TEXT + '''
 
 CRITICAL NOTES:
 1. Generate ONLY these three files marked with === filename ===
@@ -228,19 +207,7 @@ CRITICAL NOTES:
 8. Make it production-ready, not a prototype
 '''
 
-    else:  # Round 2
-        return f'''You are modifying an existing static web application based on new requirements.
-
-MODIFICATION REQUEST:
-{brief}
-{attachments_info}
-{checks_info}
-
-EXISTING CODE:
-```html
-{existing_code[:3000]}
-{"... (truncated for brevity)" if len(existing_code) > 3000 else ""}
-```
+_STATIC_PREFIX_R2 = '''You are modifying an existing static web application based on new requirements.
 
 REQUIREMENTS:
 1. PRESERVE all existing functionality that still works
@@ -273,29 +240,79 @@ OUTPUT FORMAT:
 === LICENSE ===
 [Keep MIT License unchanged]
 
-CRITICAL: Output complete working code, not snippets. Every ID from checks must exist and function.'''
+CRITICAL: Output complete working code, not snippets. Every ID from checks must exist and function.
+'''
 
+# Interned so the two template bases stay single shared objects even if
+# equal literals appear elsewhere (e.g. in tests or tooling).
+_STATIC_PREFIX_R1 = sys.intern(_STATIC_PREFIX_R1)
+_STATIC_PREFIX_R2 = sys.intern(_STATIC_PREFIX_R2)
 
-def get_mit_license() -> str:
-    """Return MIT LICENSE text."""
-    return """MIT License
 
-Copyright (c) 2025
+def create_static_site_prompt(
+    brief: str,
+    checks: List[str],
+    attachments: List[Attachment],
+    round: int = 1,
+    existing_code: str = None
+) -> str:
+    """
+    Create prompt for static HTML/JS/CSS generation.
+
+    The static prefix is a precomputed constant and the assembled prompt
+    is memoized, so retries on the same request reuse the built string
+    instead of re-slicing and re-joining it.
+    """
+    attach_key = tuple(
+        (
+            att.name,
+            att.url.split(";")[0].replace("data:", "") if ":" in att.url else "unknown",
+        )
+        for att in attachments
+    )
+    return _build_prompt(brief, tuple(checks), attach_key, round, existing_code)
+
+
+@functools.lru_cache(maxsize=128)
+def _build_prompt(
+    brief: str,
+    checks: Tuple[str, ...],
+    attachments: Tuple[Tuple[str, str], ...],
+    round: int,
+    existing_code: Optional[str]
+) -> str:
+    """Pure prompt builder keyed on hashable request parts."""
 
-Permission is hereby granted, free of charge, to any person obtaining a copy
-of this software and associated documentation files (the "Software"), to deal
-in the Software without restriction, including without limitation the rights
-to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
-copies of the Software, and to permit persons to whom the Software is
-furnished to do so, subject to the following conditions:
+    attachments_info = ""
+    if attachments:
+        parts = ["\n\nATTACHMENTS PROVIDED:\n"]
+        for name, mime_type in attachments:
+            parts.append(f"- {name} ({mime_type}) - embedded as data URI\n")
+        parts.append("\nIMPORTANT: Access attachments using their data URIs or embed them inline.\n")
+        attachments_info = "".join(parts)
 
-The above copyright notice and this permission notice shall be included in all
-copies or substantial portions of the Software.
+    checks_info = ""
+    if checks:
+        numbered = "\n".join(f"{i}. {check}" for i, check in enumerate(checks, 1))
+        checks_info = (
+            "\n\nEVALUATION CRITERIA (MUST MEET ALL):\n"
+            + numbered
+            + "\n\nCRITICAL: Every check must pass. Ensure all IDs, classes, and functionality exist.\n"
+        )
 
-THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
-IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
-FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
-AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
-LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
-OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
-SOFTWARE."""
\ No newline at end of file
+    if round == 1 or not existing_code:
+        tail = f"\nTASK:\n{brief}\n{attachments_info}{checks_info}"
+        return "".join([_STATIC_PREFIX_R1, tail])
+
+    # Round 2+
+    existing_block = (
+        f"\nEXISTING CODE:\n```html\n{existing_code[:3000]}\n"
+        f'{"... (truncated for brevity)" if len(existing_code) > 3000 else ""}\n```\n'
+    )
+    tail = f"\nMODIFICATION REQUEST:\n{brief}\n{attachments_info}{checks_info}{existing_block}"
+    return "".join([_STATIC_PREFIX_R2, tail])
+
+
+def get_mit_license() -> str:
+    """Return the shared MIT LICENSE text."""
+    return MIT_LICENSE_TEXT
@@ -1,106 +1,152 @@
-"""
-=== FIXED: src/tds_virtual_ta/main.py ===
-FastAPI application with correct endpoint path
-"""
-
-import asyncio
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Request
-from fastapi.responses import JSONResponse
-from fastapi.middleware.cors import CORSMiddleware
-
-from .config import settings
-from .models import TaskRequest, TaskResponse
-from .worker import process_task
-from .utils.security import validate_secret
-from .utils.logging_config import setup_logging, get_logger
-
-setup_logging()
-logger = get_logger(__name__)
-
-app = FastAPI(
-    title="TDS LLM Code Deployment",
-    description="Automated code generation and deployment for IIT Madras TDS",
-    version="1.0.0"
-)
-
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-
-@app.get("/")
-async def root():
-    """Service info."""
-    return {
-        "service": "TDS LLM Code Deployment",
-        "version": "1.0.0",
-        "status": "running",
-        "endpoints": {
-            "health": "/health",
-            "api": "/api-endpoint",
-            "docs": "/docs"
-        }
-    }
-
-
-@app.get("/health")
-async def health():
-    """Health check."""
-    return {"status": "healthy"}
-
-
-@app.post("/api-endpoint", response_model=TaskResponse, status_code=200)
-async def api_endpoint(
-    request: TaskRequest,
-    background_tasks: BackgroundTasks
-):
-    """
-    Main API endpoint that receives task requests.
-    
-    CRITICAL: Must return HTTP 200 immediately and process in background.
-    Must complete within 10 minutes.
-    """
-    
-    # Validate secret
-    if not validate_secret(request.secret):
-        logger.warning(f"Invalid secret for email: {request.email}")
-        raise HTTPException(status_code=401, detail="Invalid secret")
-    
-    logger.info(
-        f"Task received: {request.task} (Round {request.round}) for {request.email}"
-    )
-    
-    # Add background task - MUST complete within 10 minutes
-    background_tasks.add_task(process_task, request)
-    
-    # Return immediate HTTP 200
-    return TaskResponse(
-        status="accepted",
-        message="Request received, processing"
-    )
-
-
-@app.exception_handler(Exception)
-async def global_exception_handler(request: Request, exc: Exception):
-    """Global exception handler."""
-    logger.error(f"Unhandled exception: {exc}", exc_info=True)
-    return JSONResponse(
-        status_code=500,
-        content={"detail": "Internal server error", "error": str(exc)}
-    )
-
-
-if __name__ == "__main__":
-    import uvicorn
-    
-    uvicorn.run(
-        "src.tds_virtual_ta.main:app",
-        host=settings.service_host,
-        port=settings.service_port,
-        reload=False,
-        log_level=settings.log_level.lower()
+"""
+=== FIXED: src/tds_virtual_ta/main.py ===
+FastAPI application with correct endpoint path
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+import orjson
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from fastapi.middleware.cors import CORSMiddleware
+
+from .config import get_settings
+from .models import TaskRequest
+from .worker import process_task
+from .github.async_client import close_async_client
+from .llm.http import close_client
+from .utils.security import validate_secret
+from .utils.logging_config import setup_logging, get_logger
+
+setup_logging()
+logger = get_logger(__name__)
+
+
+async def _worker(queue: "asyncio.Queue[TaskRequest]"):
+    """Drain tasks off the shared queue, one at a time per worker."""
+    while True:
+        request = await queue.get()
+        try:
+            await process_task(request)
+        except Exception:
+            logger.error("Worker task failed", exc_info=True)
+        finally:
+            queue.task_done()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start the bounded worker pool; drain it and close the shared HTTP client on shutdown."""
+    settings = get_settings()
+    app.state.task_queue = asyncio.Queue(maxsize=settings.task_queue_size)
+    workers = [
+        asyncio.create_task(_worker(app.state.task_queue))
+        for _ in range(settings.worker_concurrency)
+    ]
+    yield
+    await app.state.task_queue.join()
+    for worker in workers:
+        worker.cancel()
+    await asyncio.gather(*workers, return_exceptions=True)
+    await close_client()
+    await close_async_client()
+
+
+app = FastAPI(
+    title="TDS LLM Code Deployment",
+    description="Automated code generation and deployment for IIT Madras TDS",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
+)
+
+# The accept body is a fixed two-field literal - serialize it once at
+# import and hand each request a tiny Response around the same bytes.
+_ACCEPTED_BODY = orjson.dumps(
+    {"status": "accepted", "message": "Request received, processing"}
+)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+
+@app.get("/")
+async def root():
+    """Service info."""
+    return {
+        "service": "TDS LLM Code Deployment",
+        "version": "1.0.0",
+        "status": "running",
+        "endpoints": {
+            "health": "/health",
+            "api": "/api-endpoint",
+            "docs": "/docs"
+        }
+    }
+
+
+@app.get("/health")
+async def health():
+    """Health check."""
+    return {"status": "healthy"}
+
+
+@app.post("/api-endpoint", status_code=202)
+async def api_endpoint(request: TaskRequest):
+    """
+    Main API endpoint that receives task requests.
+
+    Returns HTTP 202 immediately and processes on the bounded worker
+    pool. Must complete within 10 minutes.
+    """
+
+    # Validate secret
+    if not validate_secret(request.secret):
+        logger.warning(f"Invalid secret for email: {request.email}")
+        raise HTTPException(status_code=401, detail="Invalid secret")
+
+    logger.info(
+        f"Task received: {request.task} (Round {request.round}) for {request.email}"
+    )
+
+    # Enqueue for the worker pool - MUST complete within 10 minutes
+    try:
+        app.state.task_queue.put_nowait(request)
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Server at capacity, retry later")
+
+    # Accept immediately - no response model, no per-request serialization
+    return Response(
+        content=_ACCEPTED_BODY,
+        status_code=202,
+        media_type="application/json"
+    )
+
+
+@app.exception_handler(Exception)
+async def global_exception_handler(request: Request, exc: Exception):
+    """Global exception handler."""
+    logger.error(f"Unhandled exception: {exc}", exc_info=True)
+    return JSONResponse(
+        status_code=500,
+        content={"detail": "Internal server error", "error": str(exc)}
+    )
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    settings = get_settings()
+    uvicorn.run(
+        "src.tds_virtual_ta.main:app",
+        host=settings.service_host,
+        port=settings.service_port,
+        reload=False,
+        log_level=settings.log_level.lower()
     )
\ No newline at end of file
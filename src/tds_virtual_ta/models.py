@@ -46,8 +46,12 @@ class EvaluationResult(BaseModel):
     CORRECTED: Result to POST to evaluation_url.
     
     This must be sent within 10 minutes of receiving request.
+
+    Fields are copied verbatim from the already-validated TaskRequest,
+    so plain str types are used here - re-running email/URL validation
+    on the outbound copy is pure overhead.
     """
-    email: EmailStr = Field(..., description="Copy from request")
+    email: str = Field(..., description="Copy from request")
     task: str = Field(..., description="Copy from request")
     round: int = Field(..., description="Copy from request")
     nonce: str = Field(..., description="Copy from request")
@@ -1,138 +1,160 @@
-
-import asyncio
-import random
-from typing import TypeVar, Callable, Type, Tuple
-from functools import wraps
-import logging
-
-from ..config import settings
-
-logger = logging.getLogger(__name__)
-
-T = TypeVar('T')
-
-
-def exponential_backoff(
-    attempt: int,
-    base: float = 1.0,
-    factor: float = 2.0,
-    max_delay: float = 60.0,
-    jitter: bool = True
-) -> float:
-    """
-    Calculate exponential backoff delay.
-    
-    Args:
-        attempt: Attempt number (0-indexed)
-        base: Base delay
-        factor: Exponential factor
-        max_delay: Maximum delay
-        jitter: Add random jitter
-    
-    Returns:
-        Delay in seconds
-    """
-    delay = min(base * (factor ** attempt), max_delay)
-    
-    if jitter:
-        jitter_amount = delay * 0.25
-        delay = delay + random.uniform(-jitter_amount, jitter_amount)
-    
-    return max(0, delay)
-
-
-def retry_async(
-    max_attempts: int = None,
-    exceptions: Tuple[Type[Exception], ...] = (Exception,),
-    backoff_factor: float = None
-):
-    """
-    Decorator for async functions with retry logic.
-    
-    Args:
-        max_attempts: Max retry attempts
-        exceptions: Exception types to retry on
-        backoff_factor: Backoff multiplier
-    """
-    if max_attempts is None:
-        max_attempts = settings.max_retries
-    
-    if backoff_factor is None:
-        backoff_factor = settings.retry_backoff_factor
-    
-    def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        @wraps(func)
-        async def wrapper(*args, **kwargs) -> T:
-            last_exception = None
-            
-            for attempt in range(max_attempts):
-                try:
-                    return await func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_attempts - 1:
-                        logger.error(
-                            f"{func.__name__} failed after {max_attempts} attempts: {e}"
-                        )
-                        raise
-                    
-                    delay = exponential_backoff(attempt, factor=backoff_factor)
-                    
-                    logger.warning(
-                        f"{func.__name__} attempt {attempt + 1} failed, "
-                        f"retrying in {delay:.2f}s: {e}"
-                    )
-                    
-                    await asyncio.sleep(delay)
-            
-            raise last_exception
-        
-        return wrapper
-    return decorator
-
-
-def retry_sync(
-    max_attempts: int = None,
-    exceptions: Tuple[Type[Exception], ...] = (Exception,),
-    backoff_factor: float = None
-):
-    """
-    Decorator for sync functions with retry logic.
-    """
-    if max_attempts is None:
-        max_attempts = settings.max_retries
-    
-    if backoff_factor is None:
-        backoff_factor = settings.retry_backoff_factor
-    
-    def decorator(func: Callable[..., T]) -> Callable[..., T]:
-        @wraps(func)
-        def wrapper(*args, **kwargs) -> T:
-            import time
-            last_exception = None
-            
-            for attempt in range(max_attempts):
-                try:
-                    return func(*args, **kwargs)
-                except exceptions as e:
-                    last_exception = e
-                    
-                    if attempt == max_attempts - 1:
-                        logger.error(
-                            f"{func.__name__} failed after {max_attempts} attempts"
-                        )
-                        raise
-                    
-                    delay = exponential_backoff(attempt, factor=backoff_factor)
-                    logger.warning(
-                        f"{func.__name__} attempt {attempt + 1} failed, "
-                        f"retrying in {delay:.2f}s"
-                    )
-                    time.sleep(delay)
-            
-            raise last_exception
-        
-        return wrapper
-    return decorator
-
+
+import asyncio
+import random
+from typing import TypeVar, Callable, Type, Tuple, Union
+from functools import lru_cache, wraps
+import logging
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Attempts are small and bounded, so the exponential curve is computed
+# once per (base, factor, max_delay) combination instead of doing **
+# on every retry.
+_MAX_TABLE_ATTEMPTS = 16
+
+
+@lru_cache(maxsize=8)
+def _delay_table(base: float, factor: float, max_delay: float) -> Tuple[float, ...]:
+    return tuple(
+        min(base * factor ** i, max_delay) for i in range(_MAX_TABLE_ATTEMPTS)
+    )
+
+
+def exponential_backoff(
+    attempt: int,
+    base: float = 1.0,
+    factor: float = 2.0,
+    max_delay: float = 60.0,
+    jitter: bool = True
+) -> float:
+    """
+    Calculate exponential backoff delay from a precomputed table.
+
+    Args:
+        attempt: Attempt number (0-indexed)
+        base: Base delay
+        factor: Exponential factor
+        max_delay: Maximum delay
+        jitter: Add random jitter (+/-25%)
+
+    Returns:
+        Delay in seconds
+    """
+    table = _delay_table(base, factor, max_delay)
+    delay = table[attempt] if attempt < _MAX_TABLE_ATTEMPTS else max_delay
+
+    if jitter:
+        delay *= random.uniform(0.75, 1.25)
+
+    return delay
+
+
+def retry_async(
+    max_attempts: int = None,
+    exceptions: Union[Tuple[Type[Exception], ...], Callable] = (Exception,),
+    backoff_factor: float = None
+):
+    """
+    Decorator for async functions with retry logic.
+
+    Args:
+        max_attempts: Max retry attempts
+        exceptions: Exception types to retry on - a tuple, or a zero-arg
+            callable returning one so callers can defer heavy imports
+        backoff_factor: Backoff multiplier
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            # Resolve defaults lazily so decorating a function at import
+            # time does not force settings validation.
+            nonlocal max_attempts, backoff_factor
+            if max_attempts is None:
+                max_attempts = get_settings().max_retries
+            if backoff_factor is None:
+                backoff_factor = get_settings().retry_backoff_factor
+
+            exc_types = exceptions if isinstance(exceptions, tuple) else exceptions()
+            last_exception = None
+
+            for attempt in range(max_attempts):
+                try:
+                    return await func(*args, **kwargs)
+                except exc_types as e:
+                    last_exception = e
+                    
+                    if attempt == max_attempts - 1:
+                        logger.error(
+                            "%s failed after %d attempts: %s",
+                            func.__name__, max_attempts, e
+                        )
+                        raise
+                    
+                    delay = exponential_backoff(attempt, factor=backoff_factor)
+                    
+                    logger.warning(
+                        "%s attempt %d failed, retrying in %.2fs: %s",
+                        func.__name__, attempt + 1, delay, e
+                    )
+                    
+                    await asyncio.sleep(delay)
+            
+            raise last_exception
+        
+        return wrapper
+    return decorator
+
+
+def retry_sync(
+    max_attempts: int = None,
+    exceptions: Union[Tuple[Type[Exception], ...], Callable] = (Exception,),
+    backoff_factor: float = None
+):
+    """
+    Decorator for sync functions with retry logic.
+
+    exceptions may be a tuple of types or a zero-arg callable returning
+    one, so callers can defer heavy imports until the first call.
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @wraps(func)
+        def wrapper(*args, **kwargs) -> T:
+            import time
+            nonlocal max_attempts, backoff_factor
+            if max_attempts is None:
+                max_attempts = get_settings().max_retries
+            if backoff_factor is None:
+                backoff_factor = get_settings().retry_backoff_factor
+
+            exc_types = exceptions if isinstance(exceptions, tuple) else exceptions()
+            last_exception = None
+
+            for attempt in range(max_attempts):
+                try:
+                    return func(*args, **kwargs)
+                except exc_types as e:
+                    last_exception = e
+                    
+                    if attempt == max_attempts - 1:
+                        logger.error(
+                            "%s failed after %d attempts",
+                            func.__name__, max_attempts
+                        )
+                        raise
+                    
+                    delay = exponential_backoff(attempt, factor=backoff_factor)
+                    logger.warning(
+                        "%s attempt %d failed, retrying in %.2fs",
+                        func.__name__, attempt + 1, delay
+                    )
+                    time.sleep(delay)
+            
+            raise last_exception
+        
+        return wrapper
+    return decorator
+